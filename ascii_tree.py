@@ -4,6 +4,19 @@
 from typing import Dict, Set, List, Optional
 from dependency_graph import DependencyGraph
 
+# Разделитель заголовка дерева
+_SEP = "=" * 60
+
+# Элементы псевдографики дерева
+_BRANCH_MID = "├── "
+_BRANCH_LAST = "└── "
+_INDENT_MID = "│   "
+_INDENT_LAST = "    "
+
+# Индексируются флагом is_last: (не последний, последний)
+_BRANCHES = (_BRANCH_MID, _BRANCH_LAST)
+_INDENTS = (_INDENT_MID, _INDENT_LAST)
+
 
 class ASCIITreeGenerator:
     """Класс для генерации ASCII-дерева зависимостей."""
@@ -29,7 +42,7 @@ class ASCIITreeGenerator:
         """
         lines = []
         lines.append(f"Зависимости пакета: {self.root_package}")
-        lines.append("=" * 60)
+        lines.append(_SEP)
         lines.append("")
         
         if self.root_package not in self.graph.get_all_packages():
@@ -37,7 +50,7 @@ class ASCIITreeGenerator:
             return "\n".join(lines)
         
         self.visited.clear()
-        self._build_tree(self.root_package, "", True, lines, set())
+        self._build_tree(self.root_package, "", True, lines)
         
         return "\n".join(lines)
     
@@ -46,46 +59,59 @@ class ASCIITreeGenerator:
         package: str,
         prefix: str,
         is_last: bool,
-        lines: List[str],
-        path: Set[str]
+        lines: List[str]
     ) -> None:
         """
-        Рекурсивно строит дерево зависимостей.
+        Строит дерево зависимостей обходом в глубину с явным стеком.
         
         Args:
-            package: Текущий пакет
+            package: Корневой пакет поддерева
             prefix: Префикс для отступов
             is_last: Является ли пакет последним в списке
             lines: Список строк для вывода
-            path: Путь от корня (для обнаружения циклов)
         """
-        # Обнаружение циклов
-        if package in path:
-            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{package} [ЦИКЛ]")
-            return
-        
-        # Добавляем пакет в путь
-        path.add(package)
-        
-        # Получаем зависимости
-        deps = sorted(self.graph.get_direct_dependencies(package))
-        
-        # Выводим текущий пакет
-        if package == self.root_package:
-            lines.append(f"{package}")
-        else:
-            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{package}")
-        
-        # Обрабатываем зависимости
-        if deps:
-            new_prefix = prefix + ("    " if is_last else "│   ")
+        # Путь от корня (для обнаружения циклов) - общий для всего обхода
+        path: Set[str] = set()
+        # Сегменты префикса: добавляются при спуске и снимаются при подъеме
+        prefix_parts: List[str] = [prefix] if prefix else []
+        # Кадры стека: [пакет, зависимости, индекс следующей]
+        stack: List[list] = []
+        
+        def enter(pkg: str, pkg_is_last: bool) -> None:
+            connector = _BRANCHES[pkg_is_last]
+            
+            # Обнаружение циклов
+            if pkg in path:
+                lines.append(f"{''.join(prefix_parts)}{connector}{pkg} [ЦИКЛ]")
+                return
             
-            for i, dep in enumerate(deps):
-                is_last_dep = (i == len(deps) - 1)
-                self._build_tree(dep, new_prefix, is_last_dep, lines, path.copy())
+            # Добавляем пакет в путь
+            path.add(pkg)
+            
+            # Выводим текущий пакет
+            if pkg == self.root_package:
+                lines.append(pkg)
+            else:
+                lines.append(f"{''.join(prefix_parts)}{connector}{pkg}")
+            
+            prefix_parts.append(_INDENTS[pkg_is_last])
+            stack.append([pkg, self.graph.get_sorted_direct_dependencies(pkg), 0])
         
-        # Удаляем пакет из пути после обработки
-        path.discard(package)
+        enter(package, is_last)
+        
+        while stack:
+            frame = stack[-1]
+            pkg, deps, i = frame
+            
+            if i == len(deps):
+                # Удаляем пакет из пути после обработки
+                stack.pop()
+                prefix_parts.pop()
+                path.discard(pkg)
+                continue
+            
+            frame[2] = i + 1
+            enter(deps[i], i == len(deps) - 1)
     
     def generate_compact(self) -> str:
         """
@@ -96,7 +122,7 @@ class ASCIITreeGenerator:
         """
         lines = []
         lines.append(f"Зависимости пакета: {self.root_package} (компактное представление)")
-        lines.append("=" * 60)
+        lines.append(_SEP)
         lines.append("")
         
         if self.root_package not in self.graph.get_all_packages():
@@ -116,35 +142,51 @@ class ASCIITreeGenerator:
         lines: List[str]
     ) -> None:
         """
-        Рекурсивно строит компактное дерево зависимостей (без повторений).
+        Строит компактное дерево зависимостей (без повторений)
+        обходом в глубину с явным стеком.
         
         Args:
-            package: Текущий пакет
+            package: Корневой пакет поддерева
             prefix: Префикс для отступов
             is_last: Является ли пакет последним в списке
             lines: Список строк для вывода
         """
-        # Пропускаем уже посещенные пакеты (кроме корневого)
-        if package != self.root_package and package in self.visited:
-            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{package} [уже показано выше]")
-            return
-        
-        self.visited.add(package)
+        # Сегменты префикса: добавляются при спуске и снимаются при подъеме
+        prefix_parts: List[str] = [prefix] if prefix else []
+        # Кадры стека: [зависимости, индекс следующей]
+        stack: List[list] = []
         
-        # Получаем зависимости
-        deps = sorted(self.graph.get_direct_dependencies(package))
+        def enter(pkg: str, pkg_is_last: bool) -> None:
+            connector = _BRANCHES[pkg_is_last]
+            
+            # Пропускаем уже посещенные пакеты. Корень помечается посещенным
+            # при выводе, поэтому повторно достигнутый корень (например, при
+            # зависимости пакета от самого себя) тоже не раскрывается
+            if pkg in self.visited:
+                lines.append(f"{''.join(prefix_parts)}{connector}{pkg} [уже показано выше]")
+                return
+            
+            self.visited.add(pkg)
+            
+            # Выводим текущий пакет
+            if pkg == self.root_package:
+                lines.append(pkg)
+            else:
+                lines.append(f"{''.join(prefix_parts)}{connector}{pkg}")
+            
+            prefix_parts.append(_INDENTS[pkg_is_last])
+            stack.append([self.graph.get_sorted_direct_dependencies(pkg), 0])
         
-        # Выводим текущий пакет
-        if package == self.root_package:
-            lines.append(f"{package}")
-        else:
-            lines.append(f"{prefix}{'└── ' if is_last else '├── '}{package}")
+        enter(package, is_last)
         
-        # Обрабатываем зависимости
-        if deps:
-            new_prefix = prefix + ("    " if is_last else "│   ")
+        while stack:
+            frame = stack[-1]
+            deps, i = frame
             
-            for i, dep in enumerate(deps):
-                is_last_dep = (i == len(deps) - 1)
-                self._build_tree_compact(dep, new_prefix, is_last_dep, lines)
-
+            if i == len(deps):
+                stack.pop()
+                prefix_parts.pop()
+                continue
+            
+            frame[1] = i + 1
+            enter(deps[i], i == len(deps) - 1)
@@ -6,6 +6,12 @@ import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+# Используем C-реализацию загрузчика (libyaml), если она доступна
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ConfigError(Exception):
     """Исключение для ошибок конфигурации."""
@@ -15,14 +21,17 @@ class ConfigError(Exception):
 class ConfigParser:
     """Класс для парсинга и валидации конфигурации."""
     
-    REQUIRED_PARAMS = [
-        'package_name',
-        'repository_url',
-        'test_mode',
-        'package_version',
-        'ascii_tree_mode',
-        'filter_substring'
-    ]
+    # Схема параметров: (имя, тип, должна ли строка быть непустой после strip)
+    _SCHEMA = (
+        ('package_name', str, True),
+        ('repository_url', str, True),
+        ('test_mode', bool, False),
+        ('package_version', str, True),
+        ('ascii_tree_mode', bool, False),
+        ('filter_substring', str, False),
+    )
+    
+    REQUIRED_PARAMS = [name for name, _, _ in _SCHEMA]
     
     def __init__(self, config_path: str = "config.yaml"):
         """
@@ -51,7 +60,7 @@ class ConfigParser:
         # Загрузка YAML
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+                self.config = yaml.load(f.read(), Loader=_YamlLoader)
         except yaml.YAMLError as e:
             raise ConfigError(f"Ошибка парсинга YAML: {e}")
         except Exception as e:
@@ -84,23 +93,19 @@ class ConfigParser:
                 f"Отсутствуют обязательные параметры: {', '.join(missing_params)}"
             )
         
-        # Валидация package_name
-        package_name = self.config.get('package_name')
-        if not isinstance(package_name, str) or not package_name.strip():
-            raise ConfigError("Параметр 'package_name' должен быть непустой строкой")
-        
-        # Валидация repository_url
-        repository_url = self.config.get('repository_url')
-        if not isinstance(repository_url, str) or not repository_url.strip():
-            raise ConfigError("Параметр 'repository_url' должен быть непустой строкой")
-        
-        # Валидация test_mode
-        test_mode = self.config.get('test_mode')
-        if not isinstance(test_mode, bool):
-            raise ConfigError("Параметр 'test_mode' должен быть булевым значением (true/false)")
+        # Валидация типов и нормализация строковых значений за один проход
+        for name, expected_type, strip_nonempty in self._SCHEMA:
+            value = self.config[name]
+            if not isinstance(value, expected_type):
+                raise ConfigError(self._type_error_message(name, expected_type, strip_nonempty))
+            if expected_type is str:
+                value = value.strip()
+                if strip_nonempty and not value:
+                    raise ConfigError(self._type_error_message(name, expected_type, strip_nonempty))
+                self.config[name] = value
         
         # Валидация test_repository_path (если test_mode = true)
-        if test_mode:
+        if self.config['test_mode']:
             test_repository_path = self.config.get('test_repository_path', '')
             if not isinstance(test_repository_path, str):
                 raise ConfigError("Параметр 'test_repository_path' должен быть строкой")
@@ -109,28 +114,28 @@ class ConfigParser:
                     f"Файл тестового репозитория не найден: {test_repository_path}"
                 )
         
-        # Валидация package_version
-        package_version = self.config.get('package_version')
-        if not isinstance(package_version, str) or not package_version.strip():
-            raise ConfigError("Параметр 'package_version' должен быть непустой строкой")
-        
-        # Валидация ascii_tree_mode
-        ascii_tree_mode = self.config.get('ascii_tree_mode')
-        if not isinstance(ascii_tree_mode, bool):
-            raise ConfigError(
-                "Параметр 'ascii_tree_mode' должен быть булевым значением (true/false)"
-            )
-        
-        # Валидация filter_substring
-        filter_substring = self.config.get('filter_substring')
-        if not isinstance(filter_substring, str):
-            raise ConfigError("Параметр 'filter_substring' должен быть строкой")
+        # Валидация ssl_verify (необязательный параметр, по умолчанию true)
+        if not isinstance(self.config.setdefault('ssl_verify', True), bool):
+            raise ConfigError("Параметр 'ssl_verify' должен быть булевым значением (true/false)")
+    
+    @staticmethod
+    def _type_error_message(name: str, expected_type: type, strip_nonempty: bool) -> str:
+        """
+        Формирует сообщение об ошибке валидации параметра.
         
-        # Нормализация значений
-        self.config['package_name'] = package_name.strip()
-        self.config['repository_url'] = repository_url.strip()
-        self.config['package_version'] = package_version.strip()
-        self.config['filter_substring'] = filter_substring.strip() if filter_substring else ""
+        Args:
+            name: Имя параметра
+            expected_type: Ожидаемый тип значения
+            strip_nonempty: Должна ли строка быть непустой
+            
+        Returns:
+            Текст сообщения об ошибке
+        """
+        if expected_type is bool:
+            return f"Параметр '{name}' должен быть булевым значением (true/false)"
+        if strip_nonempty:
+            return f"Параметр '{name}' должен быть непустой строкой"
+        return f"Параметр '{name}' должен быть строкой"
     
     def get_config(self) -> Dict[str, Any]:
         """
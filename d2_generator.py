@@ -1,6 +1,7 @@
 """
 Модуль для генерации диаграмм D2 из графа зависимостей.
 """
+from bisect import bisect_left
 from typing import Dict, Set
 from dependency_graph import DependencyGraph
 
@@ -26,64 +27,71 @@ class D2Generator:
         Returns:
             Строка с описанием графа на языке D2
         """
-        lines = []
-        lines.append("# Граф зависимостей пакета")
-        lines.append(f"# Корневой пакет: {self.root_package}")
-        lines.append("")
+        # Получаем все пакеты в графе (сортируем один раз для узлов и связей)
+        sorted_packages = sorted(self.graph.get_all_packages())
+        node_count = len(sorted_packages)
+        root = self.root_package
         
-        # Получаем все пакеты в графе
-        all_packages = self.graph.get_all_packages()
+        # Число строк известно заранее: заголовок (3), узлы, пустая строка, связи.
+        # Выделяем список сразу нужного размера, чтобы избежать его расширений
+        edge_count = sum(
+            len(self.graph.get_direct_dependencies(pkg)) for pkg in sorted_packages
+        )
+        lines = [""] * (node_count + edge_count + 4)
+        lines[0] = "# Граф зависимостей пакета"
+        lines[1] = f"# Корневой пакет: {root}"
+        # lines[2] - пустая строка
         
-        # Добавляем все узлы
-        for pkg in sorted(all_packages):
-            # Выделяем корневой пакет
-            if pkg == self.root_package:
-                lines.append(f'"{pkg}": {{')
-                lines.append('  style.fill: "#e1f5ff"')
-                lines.append('  style.stroke: "#01579b"')
-                lines.append('  style.stroke-width: 3')
-                lines.append("}")
-            else:
-                lines.append(f'"{pkg}"')
+        # Добавляем все узлы одним срезом
+        lines[3:3 + node_count] = [f'"{pkg}"' for pkg in sorted_packages]
         
-        lines.append("")
+        # Выделяем корневой пакет (список отсортирован - ищем его бинарным поиском)
+        root_pos = bisect_left(sorted_packages, root)
+        if root_pos < node_count and sorted_packages[root_pos] == root:
+            lines[3 + root_pos] = (
+                f'"{root}": {{\n'
+                f'  style.fill: "#e1f5ff"\n'
+                f'  style.stroke: "#01579b"\n'
+                f'  style.stroke-width: 3\n'
+                f'}}'
+            )
         
-        # Добавляем все связи
-        visited_edges = set()
-        for pkg in sorted(all_packages):
-            deps = self.graph.get_direct_dependencies(pkg)
-            for dep in sorted(deps):
-                edge = (pkg, dep)
-                if edge not in visited_edges:
-                    # Выделяем прямые зависимости корневого пакета
-                    if pkg == self.root_package:
-                        lines.append(f'"{pkg}" -> "{dep}": {{')
-                        lines.append('  style.stroke: "#0277bd"')
-                        lines.append('  style.stroke-width: 2')
-                        lines.append("}")
-                    else:
-                        lines.append(f'"{pkg}" -> "{dep}"')
-                    visited_edges.add(edge)
+        # Пустая строка между узлами и связями
+        idx = 3 + node_count + 1
+        
+        # Связи найденных циклов индексируем заранее, чтобы выделять
+        # их прямо при выводе, без отдельного прохода по циклам
+        cycle_edges = {
+            (cycle[i], cycle[i + 1])
+            for cycle in self.graph.get_cycles()
+            for i in range(len(cycle) - 1)
+        }
         
-        # Добавляем информацию о циклах
-        cycles = self.graph.get_cycles()
-        if cycles:
-            lines.append("")
-            lines.append("# Циклические зависимости")
-            for i, cycle in enumerate(cycles, 1):
-                if len(cycle) > 1:
-                    # Создаем связи для цикла с выделением
-                    for j in range(len(cycle) - 1):
-                        from_node = cycle[j]
-                        to_node = cycle[j + 1]
-                        edge = (from_node, to_node)
-                        if edge in visited_edges:
-                            # Обновляем существующую связь
-                            lines.append(f'"{from_node}" -> "{to_node}": {{')
-                            lines.append('  style.stroke: "#d32f2f"')
-                            lines.append('  style.stroke-width: 2')
-                            lines.append('  style.stroke-dash: 3')
-                            lines.append("}")
+        # Добавляем все связи (зависимости пакета хранятся во множестве,
+        # поэтому каждая связь встречается ровно один раз)
+        get_sorted_deps = self.graph.get_sorted_direct_dependencies
+        for pkg in sorted_packages:
+            for dep in get_sorted_deps(pkg):
+                if (pkg, dep) in cycle_edges:
+                    # Выделяем связи циклических зависимостей
+                    lines[idx] = (
+                        f'"{pkg}" -> "{dep}": {{\n'
+                        f'  style.stroke: "#d32f2f"\n'
+                        f'  style.stroke-width: 2\n'
+                        f'  style.stroke-dash: 3\n'
+                        f'}}'
+                    )
+                elif pkg == root:
+                    # Выделяем прямые зависимости корневого пакета
+                    lines[idx] = (
+                        f'"{pkg}" -> "{dep}": {{\n'
+                        f'  style.stroke: "#0277bd"\n'
+                        f'  style.stroke-width: 2\n'
+                        f'}}'
+                    )
+                else:
+                    lines[idx] = f'"{pkg}" -> "{dep}"'
+                idx += 1
         
         return "\n".join(lines)
 
@@ -1,8 +1,8 @@
 """
 Модуль для построения графа зависимостей с использованием DFS алгоритма.
 """
-from typing import Dict, Set, List, Optional
-from collections import defaultdict
+from typing import Dict, Set, List, Optional, Tuple, Iterator, FrozenSet, NamedTuple
+from collections import defaultdict, deque
 
 
 class DependencyGraphError(Exception):
@@ -10,6 +10,15 @@ class DependencyGraphError(Exception):
     pass
 
 
+class GraphAnalysis(NamedTuple):
+    """Результаты анализа графа относительно одного пакета."""
+    
+    direct_dependencies: Set[str]
+    all_dependencies: FrozenSet[str]
+    reverse_dependencies: Set[str]
+    cycles: List[List[str]]
+
+
 class DependencyGraph:
     """Класс для представления и работы с графом зависимостей."""
     
@@ -21,10 +30,24 @@ class DependencyGraph:
             filter_substring: Подстрока для фильтрации пакетов
         """
         self.graph: Dict[str, Set[str]] = defaultdict(set)
+        # Обратные ребра: пакет -> пакеты, которые напрямую от него зависят
+        self._reverse_graph: Dict[str, Set[str]] = defaultdict(set)
+        # Все пакеты графа (пакеты и их зависимости)
+        self._all_packages: Set[str] = set()
         self.filter_substring = filter_substring.lower() if filter_substring else ""
-        self.visited: Set[str] = set()
-        self.recursion_stack: Set[str] = set()
+        # Кэш результатов фильтрации: имя пакета -> нужно ли его отфильтровать
+        self._filter_cache: Dict[str, bool] = {}
         self.cycles: List[List[str]] = []
+        # Циклы и замыкания всех пакетов пересчитываются лениво
+        # (одним проходом Тарьяна) после изменения графа
+        self._analysis_dirty = False
+        # Кэш транзитивных замыканий: пакет -> все его зависимости
+        self._trans_cache: Dict[str, FrozenSet[str]] = {}
+        # Кэш отсортированных прямых зависимостей: пакет -> кортеж имен
+        self._sorted_cache: Dict[str, Tuple[str, ...]] = {}
+        # Пакеты, подграф которых уже полностью построен предыдущими обходами:
+        # их зависимости повторно не запрашиваются
+        self._expanded: Set[str] = set()
     
     def _should_filter(self, package_name: str) -> bool:
         """
@@ -38,7 +61,13 @@ class DependencyGraph:
         """
         if not self.filter_substring:
             return False
-        return self.filter_substring in package_name.lower()
+        
+        try:
+            return self._filter_cache[package_name]
+        except KeyError:
+            result = self.filter_substring in package_name.lower()
+            self._filter_cache[package_name] = result
+            return result
     
     def add_dependency(self, package: str, dependency: str) -> None:
         """
@@ -53,96 +82,180 @@ class DependencyGraph:
             return
         
         self.graph[package].add(dependency)
-        # Убеждаемся, что зависимость тоже есть в графе (даже если у неё нет зависимостей)
-        if dependency not in self.graph:
-            self.graph[dependency] = set()
+        self._reverse_graph[dependency].add(package)
+        self._all_packages.add(package)
+        self._all_packages.add(dependency)
+        self._trans_cache.clear()
+        self._sorted_cache.pop(package, None)
+        self._analysis_dirty = True
+        if package in self._expanded:
+            # Подграфы, содержащие пакет, больше нельзя считать полными
+            self._expanded.clear()
+        # Убеждаемся, что зависимость тоже есть в графе (даже если у неё нет зависимостей):
+        # обращение к defaultdict само создает пустое множество
+        self.graph[dependency]
     
     def build_graph_dfs(
         self,
         package: str,
         get_dependencies_func,
-        visited: Optional[Set[str]] = None,
-        path: Optional[List[str]] = None
+        visited: Optional[Set[str]] = None
     ) -> None:
         """
-        Строит граф зависимостей используя алгоритм DFS с рекурсией.
+        Строит граф зависимостей используя алгоритм DFS.
+        
+        Обход выполняется итеративно с явным стеком, поэтому глубина графа
+        не ограничена лимитом рекурсии Python. Циклы во время обхода
+        не отслеживаются - они находятся по готовому графу (см. get_cycles).
+        
+        Пакеты, подграф которых уже построен предыдущими вызовами, повторно
+        не обходятся: их зависимости уже есть в графе.
         
         Args:
             package: Имя пакета для обработки
             get_dependencies_func: Функция для получения зависимостей пакета
             visited: Множество посещенных пакетов (для предотвращения повторной обработки)
-            path: Текущий путь обхода (для обнаружения циклов)
         """
         if visited is None:
             visited = set()
-        if path is None:
-            path = []
         
-        # Пропускаем отфильтрованные пакеты
-        if self._should_filter(package):
-            return
+        # Стек кадров (пакет, итератор по его зависимостям)
+        stack: List[Tuple[str, Iterator[str]]] = []
+        # Пакеты, зависимости которых успешно получены в этом обходе
+        fetched: List[str] = []
         
-        # Обнаружение циклических зависимостей
-        if package in path:
-            cycle_start = path.index(package)
-            cycle = path[cycle_start:] + [package]
-            self.cycles.append(cycle)
-            return
-        
-        # Если пакет уже обработан, не обрабатываем его снова
-        if package in visited:
-            return
+        def enter(pkg: str) -> None:
+            # Пропускаем отфильтрованные и уже обработанные пакеты
+            if self._should_filter(pkg) or pkg in visited:
+                return
+            
+            visited.add(pkg)
+            
+            # Подграф пакета уже построен ранее
+            if pkg in self._expanded:
+                return
+            
+            try:
+                # Получаем зависимости пакета
+                dependencies = iter(get_dependencies_func(pkg).keys())
+                fetched.append(pkg)
+            except Exception:
+                # Если не удалось получить зависимости, просто пропускаем
+                # и продолжаем работу с другими пакетами
+                dependencies = iter(())
+            
+            stack.append((pkg, dependencies))
         
-        # Добавляем пакет в посещенные и в текущий путь
-        visited.add(package)
-        path.append(package)
+        enter(package)
         
-        try:
-            # Получаем зависимости пакета
-            dependencies = get_dependencies_func(package)
+        while stack:
+            pkg, dependencies = stack[-1]
+            dep_name = next(dependencies, None)
+            
+            if dep_name is None:
+                # Все зависимости пакета обработаны
+                stack.pop()
+                continue
             
-            # Обрабатываем каждую зависимость рекурсивно
-            for dep_name in dependencies.keys():
-                if not self._should_filter(dep_name):
-                    self.add_dependency(package, dep_name)
-                    self.build_graph_dfs(dep_name, get_dependencies_func, visited, path.copy())
-        
-        except Exception as e:
-            # Если не удалось получить зависимости, просто пропускаем
-            # и продолжаем работу с другими пакетами
-            pass
-        
-        # Удаляем пакет из текущего пути после обработки
-        if path and path[-1] == package:
-            path.pop()
+            if not self._should_filter(dep_name):
+                self.add_dependency(pkg, dep_name)
+                enter(dep_name)
+        
+        # Обход завершен: подграфы всех загруженных пакетов построены полностью
+        self._expanded.update(fetched)
     
-    def get_all_dependencies(self, package: str) -> Set[str]:
+    def build_graph_bfs(
+        self,
+        package: str,
+        get_dependencies_batch_func
+    ) -> None:
+        """
+        Строит граф зависимостей обходом в ширину по уровням.
+        
+        Зависимости всех пакетов очередного уровня запрашиваются одним
+        вызовом get_dependencies_batch_func, который может выполнять
+        запросы параллельно (см. NPMFetcher.get_dependencies_batch).
+        Циклы находятся по готовому графу (см. get_cycles).
+        
+        Args:
+            package: Имя корневого пакета
+            get_dependencies_batch_func: Функция, получающая список пакетов и
+                возвращающая словарь {пакет: зависимости}; пакеты, зависимости
+                которых получить не удалось, в словарь не попадают
+        """
+        # Пропускаем отфильтрованные пакеты и пакеты с уже построенным подграфом
+        if self._should_filter(package) or package in self._expanded:
+            return
+        
+        visited = {package}
+        frontier = [package]
+        fetched: List[str] = []
+        
+        while frontier:
+            batch = get_dependencies_batch_func(frontier)
+            next_frontier = []
+            for pkg in frontier:
+                dependencies = batch.get(pkg)
+                if dependencies is None:
+                    continue
+                fetched.append(pkg)
+                for dep_name in dependencies:
+                    if self._should_filter(dep_name):
+                        continue
+                    self.add_dependency(pkg, dep_name)
+                    if dep_name not in visited:
+                        visited.add(dep_name)
+                        if dep_name not in self._expanded:
+                            next_frontier.append(dep_name)
+            frontier = next_frontier
+        
+        # Обход завершен: подграфы всех загруженных пакетов построены полностью
+        self._expanded.update(fetched)
+    
+    def get_all_dependencies(self, package: str) -> FrozenSet[str]:
         """
         Получает все зависимости пакета (транзитивные).
         
+        Результат кэшируется; при обходе уже вычисленные замыкания
+        зависимостей объединяются без повторного спуска в их подграфы.
+        Кэш сбрасывается при любом изменении графа.
+        
         Args:
             package: Имя пакета
             
         Returns:
             Множество всех зависимостей
         """
-        if package not in self.graph:
-            return set()
-        
-        all_deps = set()
-        visited = set()
-        
-        def collect_deps(pkg: str):
-            if pkg in visited or self._should_filter(pkg):
-                return
-            visited.add(pkg)
-            for dep in self.graph.get(pkg, set()):
-                if not self._should_filter(dep):
-                    all_deps.add(dep)
-                    collect_deps(dep)
-        
-        collect_deps(package)
-        return all_deps
+        cached = self._trans_cache.get(package)
+        if cached is not None:
+            return cached
+        
+        if package not in self.graph or self._should_filter(package):
+            return frozenset()
+        
+        all_deps: Set[str] = set()
+        visited = {package}
+        stack = [package]
+        
+        # Отфильтрованные пакеты не попадают в граф (см. add_dependency),
+        # а каждая зависимость есть среди ключей графа - множества зависимостей
+        # можно объединять целиком
+        while stack:
+            dependencies = self.graph[stack.pop()]
+            all_deps.update(dependencies)
+            new_deps = dependencies - visited
+            visited.update(new_deps)
+            for dep in new_deps:
+                dep_closure = self._trans_cache.get(dep)
+                if dep_closure is not None:
+                    # Замыкание зависимости уже известно - спускаться не нужно
+                    all_deps.update(dep_closure)
+                else:
+                    stack.append(dep)
+        
+        result = frozenset(all_deps)
+        self._trans_cache[package] = result
+        return result
     
     def get_direct_dependencies(self, package: str) -> Set[str]:
         """
@@ -156,13 +269,39 @@ class DependencyGraph:
         """
         return self.graph.get(package, set())
     
+    def get_sorted_direct_dependencies(self, package: str) -> Tuple[str, ...]:
+        """
+        Получает прямые зависимости пакета в отсортированном порядке.
+        Результат кэшируется до следующего изменения графа.
+        
+        Args:
+            package: Имя пакета
+            
+        Returns:
+            Кортеж прямых зависимостей, отсортированных по имени
+        """
+        deps = self._sorted_cache.get(package)
+        if deps is None:
+            deps = tuple(sorted(self.graph.get(package, ())))
+            self._sorted_cache[package] = deps
+        return deps
+    
     def get_cycles(self) -> List[List[str]]:
         """
         Возвращает список обнаруженных циклов.
         
+        Циклы вычисляются по всему графу алгоритмом Тарьяна (компоненты
+        сильной связности) и кэшируются до следующего изменения графа.
+        Каждой компоненте из нескольких пакетов (или пакету с петлей)
+        соответствует ровно один цикл.
+        
         Returns:
             Список циклов, где каждый цикл представлен списком пакетов
+            в порядке ребер графа; первый пакет повторяется в конце. Если
+            компонента состоит из нескольких пересекающихся циклов,
+            возвращается кратчайший из циклов через её корень
         """
+        self._ensure_analysis()
         return self.cycles
     
     def has_cycles(self) -> bool:
@@ -172,140 +311,207 @@ class DependencyGraph:
         Returns:
             True если есть циклы
         """
-        return len(self.cycles) > 0
+        return len(self.get_cycles()) > 0
     
-    def get_all_packages(self) -> Set[str]:
+    def analyze(self, package: str) -> GraphAnalysis:
         """
-        Возвращает все пакеты в графе.
+        Собирает все результаты анализа пакета.
+        
+        Транзитивные зависимости и циклы берутся из общего прохода Тарьяна
+        (см. _analyze_components), а обратные зависимости - из обхода
+        в ширину по обратным ребрам (см. get_reverse_dependencies).
+        
+        Args:
+            package: Имя анализируемого пакета
         
         Returns:
-            Множество всех пакетов
+            Результаты анализа
         """
-        all_packages = set(self.graph.keys())
-        for deps in self.graph.values():
-            all_packages.update(deps)
-        return all_packages
+        self._ensure_analysis()
+        return GraphAnalysis(
+            direct_dependencies=self.get_direct_dependencies(package),
+            all_dependencies=self.get_all_dependencies(package),
+            reverse_dependencies=self.get_reverse_dependencies(package),
+            cycles=self.cycles
+        )
     
-    def get_reverse_dependencies(
-        self,
-        package: str,
-        visited: Optional[Set[str]] = None
-    ) -> Set[str]:
+    def _ensure_analysis(self) -> None:
+        """Пересчитывает циклы и замыкания, если граф изменился."""
+        if self._analysis_dirty:
+            self._analyze_components()
+            self._analysis_dirty = False
+    
+    def _analyze_components(self) -> None:
         """
-        Получает обратные зависимости пакета (пакеты, которые зависят от данного).
-        Использует алгоритм DFS для обхода графа.
-        
-        Args:
-            package: Имя пакета, для которого ищем обратные зависимости
-            visited: Множество посещенных пакетов (для предотвращения повторной обработки)
-            
-        Returns:
-            Множество пакетов, которые зависят от заданного пакета (не включая сам пакет)
+        Находит компоненты сильной связности графа итеративным вариантом
+        алгоритма Тарьяна, O(V + E).
+        
+        Компоненты извлекаются в обратном топологическом порядке, поэтому
+        к моменту извлечения компоненты замыкания всех её внешних
+        зависимостей уже известны. За тот же проход заполняются кэш
+        транзитивных замыканий (одно общее множество на компоненту)
+        и список циклов (по одному реальному циклу на компоненту).
         """
-        if visited is None:
-            visited = set()
-        
-        # Пропускаем отфильтрованные пакеты
-        if self._should_filter(package):
-            return set()
-        
-        reverse_deps = set()
-        
-        # Проходим по всем пакетам в графе
-        for pkg in self.graph.keys():
-            # Пропускаем сам пакет
-            if pkg == package:
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        scc_stack: List[str] = []
+        cycles: List[List[str]] = []
+        closures = self._trans_cache
+        
+        def enter(pkg: str) -> None:
+            index[pkg] = lowlink[pkg] = len(index)
+            scc_stack.append(pkg)
+            on_stack.add(pkg)
+            work.append((pkg, iter(self.get_sorted_direct_dependencies(pkg))))
+        
+        for root in sorted(self.graph):
+            if root in index:
                 continue
             
-            if self._should_filter(pkg) or pkg in visited:
-                continue
+            work: List[Tuple[str, Iterator[str]]] = []
+            enter(root)
             
-            # Проверяем, зависит ли этот пакет от целевого (прямо или транзитивно)
-            if self._depends_on(pkg, package, set()):
-                reverse_deps.add(pkg)
-        
-        return reverse_deps
+            while work:
+                pkg, dependencies = work[-1]
+                
+                for dep in dependencies:
+                    if dep not in index:
+                        # Спускаемся в зависимость; обход pkg продолжится позже
+                        enter(dep)
+                        break
+                    if dep in on_stack:
+                        lowlink[pkg] = min(lowlink[pkg], index[dep])
+                else:
+                    # Все зависимости обработаны - возвращаемся к родителю
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[pkg])
+                    
+                    if lowlink[pkg] == index[pkg]:
+                        # pkg - корень компоненты сильной связности
+                        component = []
+                        while True:
+                            member = scc_stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == pkg:
+                                break
+                        
+                        # Замыкание компоненты: зависимости всех её пакетов
+                        # плюс уже известные замыкания внешних зависимостей
+                        members = set(component)
+                        closure: Set[str] = set()
+                        for member in component:
+                            member_deps = self.graph[member]
+                            closure.update(member_deps)
+                            for dep in member_deps - members:
+                                closure.update(closures[dep])
+                        closure_frozen = frozenset(closure)
+                        for member in component:
+                            closures[member] = closure_frozen
+                        
+                        if len(component) > 1 or pkg in self.graph[pkg]:
+                            cycles.append(self._find_cycle_in_component(pkg, members))
+        
+        cycles.sort(key=lambda cycle: index[cycle[0]])
+        self.cycles = cycles
     
-    def _depends_on(
-        self,
-        package: str,
-        target: str,
-        visited: Set[str]
-    ) -> bool:
+    def _find_cycle_in_component(self, root: str, members: Set[str]) -> List[str]:
         """
-        Проверяет, зависит ли пакет от целевого (прямо или транзитивно).
-        Использует DFS для обхода.
+        Находит цикл через корень компоненты сильной связности: кратчайший
+        путь от корня обратно к нему обходом в ширину по ребрам компоненты.
+        Каждая пара соседних пакетов результата - реальное ребро графа.
         
         Args:
-            package: Пакет для проверки
-            target: Целевой пакет
-            visited: Множество посещенных пакетов
+            root: Корень компоненты
+            members: Пакеты компоненты
             
         Returns:
-            True если package зависит от target
+            Цикл в виде списка пакетов, начинающегося и заканчивающегося корнем
         """
-        if package == target:
-            return True
-        
-        if package in visited or self._should_filter(package):
-            return False
-        
-        visited.add(package)
-        
-        # Проверяем прямые зависимости
-        for dep in self.graph.get(package, set()):
-            if self._should_filter(dep):
-                continue
-            if dep == target:
-                return True
-            # Рекурсивно проверяем транзитивные зависимости
-            if self._depends_on(dep, target, visited):
-                return True
+        parent: Dict[str, Optional[str]] = {root: None}
+        queue = deque([root])
+        
+        while queue:
+            pkg = queue.popleft()
+            for dep in self.get_sorted_direct_dependencies(pkg):
+                if dep == root:
+                    # Восстанавливаем путь от корня до pkg и замыкаем цикл
+                    cycle = []
+                    node: Optional[str] = pkg
+                    while node is not None:
+                        cycle.append(node)
+                        node = parent[node]
+                    cycle.reverse()
+                    cycle.append(root)
+                    return cycle
+                if dep in members and dep not in parent:
+                    parent[dep] = pkg
+                    queue.append(dep)
+        
+        # Недостижимо: из любого пакета компоненты можно вернуться в корень
+        return [root, root]
+    
+    def get_all_packages(self) -> Set[str]:
+        """
+        Возвращает все пакеты в графе.
+        Множество поддерживается инкрементально в add_dependency,
+        поэтому вызов выполняется за O(1). Возвращаемое множество
+        не следует изменять.
         
-        return False
+        Returns:
+            Множество всех пакетов
+        """
+        return self._all_packages
     
-    def _find_all_reverse_deps(
+    def get_reverse_dependencies(
         self,
         package: str,
-        target: str,
-        visited: Set[str]
+        visited: Optional[Set[str]] = None
     ) -> Set[str]:
         """
-        Находит все обратные зависимости для пакета, который зависит от target.
-        Использует DFS для обхода.
+        Получает обратные зависимости пакета (пакеты, которые зависят от данного).
+        Выполняет обход в ширину по обратным ребрам, которые накапливаются
+        в add_dependency, поэтому анализ всего графа не требуется.
         
         Args:
-            package: Пакет, который зависит от target
-            target: Целевой пакет
-            visited: Множество посещенных пакетов
+            package: Имя пакета, для которого ищем обратные зависимости
+            visited: Множество пакетов, которые нужно исключить из результата
             
         Returns:
-            Множество обратных зависимостей
+            Множество пакетов, которые зависят от заданного пакета (не включая сам пакет)
         """
-        reverse_deps = set()
-        
-        if package in visited or self._should_filter(package):
-            return reverse_deps
-        
-        visited.add(package)
+        if visited is None:
+            visited = set()
         
-        # Ищем все пакеты, которые зависят от текущего пакета
-        for pkg in self.graph.keys():
-            if self._should_filter(pkg) or pkg in visited:
-                continue
-            
-            # Если пакет зависит от текущего, он тоже обратная зависимость target
-            if self._depends_on(pkg, package, visited.copy()):
-                reverse_deps.add(pkg)
-                # Рекурсивно ищем дальше
-                reverse_deps.update(self._find_all_reverse_deps(pkg, target, visited.copy()))
+        # Пропускаем отфильтрованные пакеты
+        if self._should_filter(package):
+            return set()
         
-        return reverse_deps
+        # Обход в ширину от заданного пакета по обратным ребрам
+        reverse_deps: Set[str] = set()
+        queue = deque([package])
+        while queue:
+            dependents = self._reverse_graph.get(queue.popleft())
+            if dependents:
+                new_deps = dependents - reverse_deps
+                reverse_deps.update(new_deps)
+                queue.extend(new_deps)
+        
+        # Сам пакет может оказаться в результате, если он входит в цикл
+        reverse_deps.discard(package)
+        return reverse_deps - visited if visited else reverse_deps
     
     def clear(self) -> None:
         """Очищает граф."""
         self.graph.clear()
-        self.visited.clear()
-        self.recursion_stack.clear()
+        self._reverse_graph.clear()
+        self._all_packages.clear()
         self.cycles.clear()
+        self._expanded.clear()
+        self._analysis_dirty = False
+        self._trans_cache.clear()
+        self._sorted_cache.clear()
 
@@ -5,12 +5,14 @@ CLI-приложение для визуализации графа зависи
 """
 import sys
 import argparse
+import traceback
 from config_parser import ConfigParser, ConfigError
 from npm_fetcher import NPMFetcher, NPMFetcherError
 from dependency_graph import DependencyGraph
-from test_repository_loader import TestRepositoryLoader, TestRepositoryError
-from d2_generator import D2Generator
-from ascii_tree import ASCIITreeGenerator
+
+# Разделители для форматирования вывода
+_SEP = "=" * 60
+_DASH_SEP = "-" * 60
 
 
 def print_config(config: dict) -> None:
@@ -20,9 +22,7 @@ def print_config(config: dict) -> None:
     Args:
         config: Словарь с параметрами конфигурации
     """
-    print("=" * 60)
-    print("Параметры конфигурации:")
-    print("=" * 60)
+    lines = [_SEP, "Параметры конфигурации:", _SEP]
     
     for key, value in config.items():
         # Форматирование булевых значений
@@ -31,9 +31,12 @@ def print_config(config: dict) -> None:
         else:
             value_str = str(value) if value else "(пусто)"
         
-        print(f"{key}: {value_str}")
+        lines.append(f"{key}: {value_str}")
+    
+    lines.append(_SEP)
     
-    print("=" * 60)
+    # Выводим всё одной записью вместо отдельного print на каждую строку
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -65,136 +68,156 @@ def main():
         test_mode = config.get('test_mode', False)
         
         # Этап 3: Построение графа зависимостей
-        print("=" * 60)
+        print(_SEP)
         print("Построение графа зависимостей...")
-        print("=" * 60)
+        print(_SEP)
         
         graph = DependencyGraph(filter_substring=filter_substring)
         
-        try:
-            if test_mode:
-                # Режим тестирования
-                test_repo_path = config.get('test_repository_path', '')
-                if not test_repo_path:
-                    print("Ошибка: в режиме тестирования необходимо указать test_repository_path", file=sys.stderr)
-                    return 1
-                
+        if test_mode:
+            # Режим тестирования
+            test_repo_path = config.get('test_repository_path', '')
+            if not test_repo_path:
+                print("Ошибка: в режиме тестирования необходимо указать test_repository_path", file=sys.stderr)
+                return 1
+            
+            # Модули загрузчика и визуализации импортируются только там,
+            # где они нужны, чтобы не замедлять запуск в других режимах
+            from test_repository_loader import TestRepositoryLoader, TestRepositoryError
+            
+            try:
                 loader = TestRepositoryLoader(test_repo_path)
-                get_deps_func = loader.create_dependency_getter()
-                
-                print(f"\nЗагрузка тестового репозитория из: {test_repo_path}")
-                print(f"Анализ пакета: {package_name}")
-                
-            else:
-                # Режим работы с npm registry
-                registry_url = config['repository_url']
-                fetcher = NPMFetcher(registry_url)
-                
-                def get_deps_func(pkg: str) -> dict:
-                    """Обертка для получения зависимостей через fetcher."""
-                    return fetcher.get_dependencies(pkg, "latest")
-                
-                print(f"\nПолучение зависимостей из npm registry...")
-                print(f"Пакет: {package_name} (версия: {package_version})")
+            except TestRepositoryError as e:
+                print(f"Ошибка тестового репозитория: {e}", file=sys.stderr)
+                return 1
+            get_deps_func = loader.create_dependency_getter()
+            
+            print(f"\nЗагрузка тестового репозитория из: {test_repo_path}")
+            print(f"Анализ пакета: {package_name}")
             
-            # Построение графа с использованием DFS
-            print("\nПостроение графа зависимостей (DFS)...")
+        else:
+            # Режим работы с npm registry
+            registry_url = config['repository_url']
+            fetcher = NPMFetcher(registry_url, verify_ssl=config['ssl_verify'])
             
+            print(f"\nПолучение зависимостей из npm registry...")
+            print(f"Пакет: {package_name} (версия: {package_version})")
+        
+        try:
             # Сначала строим граф от заданного пакета
-            graph.build_graph_dfs(package_name, get_deps_func)
+            if test_mode:
+                # Построение графа с использованием DFS
+                print("\nПостроение графа зависимостей (DFS)...")
+                graph.build_graph_dfs(package_name, get_deps_func)
+            else:
+                # Запросы к registry выполняются параллельно по уровням графа
+                print("\nПостроение графа зависимостей (параллельная загрузка)...")
+                with fetcher:
+                    graph.build_graph_bfs(
+                        package_name,
+                        lambda packages: fetcher.get_dependencies_batch(packages, "latest")
+                    )
             
             # В тестовом режиме строим полный граф для корректного поиска обратных зависимостей
             if test_mode:
                 # Получаем все пакеты из тестового репозитория
                 if hasattr(loader, 'repository'):
-                    all_test_packages = set(loader.repository.keys())
+                    # get_all_packages возвращает множество, которое граф пополняет
+                    # сам, поэтому достаточно получить его один раз
+                    known_packages = graph.get_all_packages()
                     # Строим граф от каждого пакета, который еще не обработан
-                    for pkg in all_test_packages:
-                        if pkg not in graph.get_all_packages():
+                    for pkg in loader.repository:
+                        if pkg not in known_packages:
                             graph.build_graph_dfs(pkg, get_deps_func)
-            
-            # Вывод результатов
-            print("\n" + "=" * 60)
-            print("Результаты анализа:")
-            print("=" * 60)
-            
-            # Прямые зависимости
-            direct_deps = graph.get_direct_dependencies(package_name)
-            print(f"\nПрямые зависимости '{package_name}': {len(direct_deps)}")
-            if direct_deps:
-                for dep in sorted(direct_deps):
-                    print(f"  - {dep}")
-            else:
-                print("  (нет прямых зависимостей)")
-            
-            # Все зависимости (транзитивные)
-            all_deps = graph.get_all_dependencies(package_name)
-            print(f"\nВсе зависимости '{package_name}' (транзитивные): {len(all_deps)}")
-            if all_deps:
-                for dep in sorted(all_deps):
-                    print(f"  - {dep}")
-            
-            # Циклические зависимости
-            cycles = graph.get_cycles()
-            if cycles:
-                print(f"\n⚠ Обнаружены циклические зависимости: {len(cycles)}")
-                for i, cycle in enumerate(cycles, 1):
-                    cycle_str = " -> ".join(cycle)
-                    print(f"  Цикл {i}: {cycle_str}")
-            else:
-                print("\n✓ Циклических зависимостей не обнаружено")
-            
-            # Обратные зависимости (Этап 4)
-            reverse_deps = graph.get_reverse_dependencies(package_name)
-            print(f"\nОбратные зависимости '{package_name}' (пакеты, которые зависят от него): {len(reverse_deps)}")
-            if reverse_deps:
-                for dep in sorted(reverse_deps):
-                    print(f"  - {dep}")
-            else:
-                print("  (нет обратных зависимостей)")
-            
-            # Статистика
-            all_packages = graph.get_all_packages()
-            print(f"\nВсего уникальных пакетов в графе: {len(all_packages)}")
-            
-            if filter_substring:
-                print(f"\nПрименена фильтрация по подстроке: '{filter_substring}'")
-            
-            # Этап 5: Визуализация
-            print("\n" + "=" * 60)
-            print("Визуализация графа зависимостей")
-            print("=" * 60)
-            
-            # Генерация D2 диаграммы
-            d2_gen = D2Generator(graph, package_name)
-            d2_diagram = d2_gen.generate()
-            
-            print("\nОписание графа на языке D2:")
-            print("-" * 60)
-            print(d2_diagram)
-            print("-" * 60)
-            
-            # Генерация ASCII-дерева (если включен режим)
-            if config.get('ascii_tree_mode', False):
-                print("\nASCII-дерево зависимостей:")
-                print("-" * 60)
-                ascii_gen = ASCIITreeGenerator(graph, package_name)
-                ascii_tree = ascii_gen.generate_compact()
-                print(ascii_tree)
-                print("-" * 60)
-            
-        except TestRepositoryError as e:
-            print(f"Ошибка тестового репозитория: {e}", file=sys.stderr)
-            return 1
         except NPMFetcherError as e:
             print(f"Ошибка получения зависимостей: {e}", file=sys.stderr)
             return 1
         except Exception as e:
             print(f"Ошибка построения графа: {e}", file=sys.stderr)
-            import traceback
             traceback.print_exc()
             return 1
         
+        # Вывод результатов
+        print("\n" + _SEP)
+        print("Результаты анализа:")
+        print(_SEP)
+        
+        # Зависимости и циклы вычисляются одним проходом по графу,
+        # обратные зависимости - обходом по обратным ребрам
+        analysis = graph.analyze(package_name)
+        
+        # Прямые зависимости входят в транзитивные, поэтому сортируем
+        # только транзитивные, а прямые выбираем из них с сохранением порядка
+        direct_deps = analysis.direct_dependencies
+        all_deps = analysis.all_dependencies
+        all_sorted = sorted(all_deps)
+        direct_sorted = [dep for dep in all_sorted if dep in direct_deps]
+        
+        # Прямые зависимости
+        print(f"\nПрямые зависимости '{package_name}': {len(direct_deps)}")
+        if direct_deps:
+            for dep in direct_sorted:
+                print(f"  - {dep}")
+        else:
+            print("  (нет прямых зависимостей)")
+        
+        # Все зависимости (транзитивные)
+        print(f"\nВсе зависимости '{package_name}' (транзитивные): {len(all_deps)}")
+        if all_deps:
+            for dep in all_sorted:
+                print(f"  - {dep}")
+        
+        # Циклические зависимости
+        cycles = analysis.cycles
+        if cycles:
+            print(f"\n⚠ Обнаружены циклические зависимости: {len(cycles)}")
+            for i, cycle in enumerate(cycles, 1):
+                cycle_str = " -> ".join(cycle)
+                print(f"  Цикл {i}: {cycle_str}")
+        else:
+            print("\n✓ Циклических зависимостей не обнаружено")
+        
+        # Обратные зависимости (Этап 4)
+        reverse_deps = analysis.reverse_dependencies
+        print(f"\nОбратные зависимости '{package_name}' (пакеты, которые зависят от него): {len(reverse_deps)}")
+        if reverse_deps:
+            for dep in sorted(reverse_deps):
+                print(f"  - {dep}")
+        else:
+            print("  (нет обратных зависимостей)")
+        
+        # Статистика
+        all_packages = graph.get_all_packages()
+        print(f"\nВсего уникальных пакетов в графе: {len(all_packages)}")
+        
+        if filter_substring:
+            print(f"\nПрименена фильтрация по подстроке: '{filter_substring}'")
+        
+        # Этап 5: Визуализация
+        print("\n" + _SEP)
+        print("Визуализация графа зависимостей")
+        print(_SEP)
+        
+        # Генерация D2 диаграммы
+        from d2_generator import D2Generator
+        d2_gen = D2Generator(graph, package_name)
+        d2_diagram = d2_gen.generate()
+        
+        print("\nОписание графа на языке D2:")
+        print(_DASH_SEP)
+        print(d2_diagram)
+        print(_DASH_SEP)
+        
+        # Генерация ASCII-дерева (если включен режим)
+        if config.get('ascii_tree_mode', False):
+            print("\nASCII-дерево зависимостей:")
+            print(_DASH_SEP)
+            from ascii_tree import ASCIITreeGenerator
+            ascii_gen = ASCIITreeGenerator(graph, package_name)
+            ascii_tree = ascii_gen.generate_compact()
+            print(ascii_tree)
+            print(_DASH_SEP)
+        
         return 0
         
     except ConfigError as e:
@@ -2,11 +2,34 @@
 Модуль для получения информации о пакетах из npm registry.
 Использует только стандартные библиотеки Python без менеджеров пакетов.
 """
-import urllib.request
-import urllib.error
+import http.client
 import ssl
 import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
+from urllib.parse import urljoin, urlsplit
+
+
+def _semver_key(version: str) -> tuple:
+    """
+    Ключ для сравнения версий semver.
+    Компоненты major.minor.patch сравниваются как числа, а нечисловой
+    компонент (например, пререлиз '0-beta') считается меньше любого числового.
+    
+    Args:
+        version: Строка версии
+        
+    Returns:
+        Кортеж для сравнения
+    """
+    return tuple(int(part) if part.isdigit() else -1 for part in version.split('.')[:3])
+
+
+# Коды ответа с перенаправлением
+_REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
 
 
 class NPMFetcherError(Exception):
@@ -14,24 +37,131 @@ class NPMFetcherError(Exception):
     pass
 
 
+class NPMNotFoundError(NPMFetcherError):
+    """Исключение для ответа 404: пакет или версия не найдены в registry."""
+    pass
+
+
 class NPMFetcher:
-    """Класс для получения информации о пакетах из npm registry."""
+    """
+    Класс для получения информации о пакетах из npm registry.
+    
+    Соединения с registry переиспользуются (keep-alive) через пул,
+    поэтому TLS-рукопожатие выполняется один раз на соединение, а не
+    на каждый запрос. После работы fetcher следует закрыть (close или
+    контекстный менеджер).
+    
+    Если для registry задан прокси (переменные окружения HTTP(S)_PROXY),
+    а также при перенаправлениях запросы выполняются через urllib.
+    """
     
-    def __init__(self, registry_url: str = "https://registry.npmjs.org"):
+    def __init__(
+        self,
+        registry_url: str = "https://registry.npmjs.org",
+        verify_ssl: bool = True,
+        max_workers: int = 16
+    ):
         """
         Инициализация fetcher.
         
         Args:
             registry_url: URL npm registry
+            verify_ssl: Проверять ли сертификат registry (отключать только
+                для окружений с нестандартными корпоративными CA)
+            max_workers: Максимальное число одновременных запросов
+                в get_dependencies_batch
         """
         self.registry_url = registry_url.rstrip('/')
+        
+        # Разбираем URL registry один раз
+        parts = urlsplit(self.registry_url)
+        self._scheme = parts.scheme
+        self._host = parts.hostname or ""
+        self._port = parts.port
+        
+        # Прокси из окружения (с учетом NO_PROXY) поддерживает только urllib
+        self._use_urllib = (
+            self._scheme in urllib.request.getproxies()
+            and not urllib.request.proxy_bypass(self._host)
+        )
+        
+        # Создаем SSL контекст для работы с HTTPS один раз на весь fetcher
+        self._ssl_ctx = ssl.create_default_context()
+        if not verify_ssl:
+            # Проверка сертификата отключена явно через конфигурацию
+            self._ssl_ctx.check_hostname = False
+            self._ssl_ctx.verify_mode = ssl.CERT_NONE
+        
+        # Пул свободных соединений; каждый поток берет соединение из пула
+        # на время запроса, поэтому параллельные запросы не делят соединение
+        self._idle_connections: List[http.client.HTTPConnection] = []
+        self._pool_lock = threading.Lock()
+        
+        # Пул потоков для пакетных запросов создается при первом использовании
+        # и живет до закрытия fetcher
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def __enter__(self) -> "NPMFetcher":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Закрывает пул потоков и все открытые соединения с registry."""
+        with self._pool_lock:
+            executor = self._executor
+            self._executor = None
+            connections = self._idle_connections
+            self._idle_connections = []
+        if executor is not None:
+            executor.shutdown()
+        for conn in connections:
+            conn.close()
+    
+    def _acquire_connection(self) -> http.client.HTTPConnection:
+        """
+        Берет свободное соединение из пула или создает новое.
+        
+        Returns:
+            Соединение с registry
+        """
+        with self._pool_lock:
+            if self._idle_connections:
+                return self._idle_connections.pop()
+        
+        return self._new_connection()
+    
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """
+        Создает новое соединение с registry в обход пула.
+        
+        Returns:
+            Соединение с registry
+        """
+        if self._scheme == "http":
+            return http.client.HTTPConnection(self._host, self._port, timeout=10)
+        return http.client.HTTPSConnection(
+            self._host, self._port, timeout=10, context=self._ssl_ctx
+        )
+    
+    def _release_connection(self, conn: http.client.HTTPConnection) -> None:
+        """
+        Возвращает соединение в пул для повторного использования.
+        
+        Args:
+            conn: Соединение с registry
+        """
+        with self._pool_lock:
+            self._idle_connections.append(conn)
     
     def _make_request(self, url: str) -> Dict[str, Any]:
         """
         Выполняет HTTP GET запрос к указанному URL.
         
         Args:
-            url: URL для запроса
+            url: URL для запроса (внутри registry)
             
         Returns:
             Распарсенный JSON ответ
@@ -40,30 +170,93 @@ class NPMFetcher:
             NPMFetcherError: При ошибках запроса или парсинга
         """
         try:
-            req = urllib.request.Request(url)
-            req.add_header('Accept', 'application/json')
-            
-            # Создаем SSL контекст для работы с HTTPS
-            # Используем unverified context для совместимости с различными системами
-            # В продакшене следует использовать проверенные сертификаты
-            ssl_context = ssl._create_unverified_context()
-            
-            with urllib.request.urlopen(req, timeout=10, context=ssl_context) as response:
-                if response.status != 200:
-                    raise NPMFetcherError(
-                        f"HTTP ошибка {response.status}: {response.reason}"
-                    )
-                
-                data = response.read().decode('utf-8')
-                return json.loads(data)
-                
-        except urllib.error.URLError as e:
+            if self._use_urllib:
+                body = self._fetch_via_urllib(url)
+            else:
+                body = self._fetch(url)
+            return json.loads(body)
+        except NPMFetcherError:
+            raise
+        except (OSError, http.client.HTTPException) as e:
             raise NPMFetcherError(f"Ошибка сети: {e}")
         except json.JSONDecodeError as e:
             raise NPMFetcherError(f"Ошибка парсинга JSON: {e}")
         except Exception as e:
             raise NPMFetcherError(f"Неожиданная ошибка: {e}")
     
+    def _fetch(self, url: str) -> bytes:
+        """
+        Получает тело ответа через соединение из пула.
+        
+        Args:
+            url: URL для запроса (внутри registry)
+            
+        Returns:
+            Тело ответа
+            
+        Raises:
+            NPMFetcherError: При ответе с ошибкой
+        """
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        
+        for attempt in range(2):
+            # Сервер мог закрыть простаивающее keep-alive соединение - тогда
+            # повторяем запрос один раз на новом соединении в обход пула:
+            # остальные соединения пула, скорее всего, тоже закрыты
+            conn = self._new_connection() if attempt else self._acquire_connection()
+            try:
+                conn.request("GET", target, headers={'Accept': 'application/json'})
+                response = conn.getresponse()
+                # Тело дочитывается всегда, чтобы соединение можно было переиспользовать
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            
+            self._release_connection(conn)
+            
+            if response.status == 200:
+                return body
+            
+            if response.status in _REDIRECT_STATUSES and response.getheader('Location'):
+                # Перенаправления (в том числе на другой хост) выполняет urllib
+                return self._fetch_via_urllib(urljoin(url, response.getheader('Location')))
+            
+            if response.status == 404:
+                raise NPMNotFoundError(f"Не найдено: {url}")
+            raise NPMFetcherError(f"HTTP ошибка {response.status}: {response.reason}")
+    
+    def _fetch_via_urllib(self, url: str) -> bytes:
+        """
+        Получает тело ответа через urllib: с учетом прокси из окружения
+        и с переходом по перенаправлениям.
+        
+        Args:
+            url: URL для запроса
+            
+        Returns:
+            Тело ответа
+            
+        Raises:
+            NPMFetcherError: При ответе с ошибкой
+        """
+        request = urllib.request.Request(url, headers={'Accept': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=10, context=self._ssl_ctx) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise NPMNotFoundError(f"Не найдено: {url}")
+            raise NPMFetcherError(f"HTTP ошибка {e.code}: {e.reason}")
+    
     def _resolve_version(self, package_name: str, version: str) -> str:
         """
         Разрешает версию пакета (например, 'latest' -> конкретная версия).
@@ -83,10 +276,10 @@ class NPMFetcher:
             if 'dist-tags' in package_info and 'latest' in package_info['dist-tags']:
                 return package_info['dist-tags']['latest']
             elif 'versions' in package_info:
-                # Если нет dist-tags, берем последнюю версию из списка
-                versions = sorted(package_info['versions'].keys(), reverse=True)
+                # Если нет dist-tags, берем наибольшую версию из списка
+                versions = package_info['versions']
                 if versions:
-                    return versions[0]
+                    return max(versions, key=_semver_key)
             
             raise NPMFetcherError(f"Не удалось определить latest версию для {package_name}")
         
@@ -107,6 +300,17 @@ class NPMFetcher:
             NPMFetcherError: При ошибках получения данных
         """
         try:
+            if version == "latest":
+                # registry отдает манифест последней версии по /{пакет}/latest -
+                # один небольшой запрос вместо полного документа пакета
+                # со всеми версиями и второго запроса за самой версией
+                try:
+                    return self._make_request(f"{self.registry_url}/{package_name}/latest")
+                except NPMNotFoundError:
+                    # registry без поддержки /latest - определяем версию
+                    # по полному документу пакета
+                    pass
+            
             # Разрешаем версию
             resolved_version = self._resolve_version(package_name, version)
             
@@ -141,4 +345,41 @@ class NPMFetcher:
         dependencies = package_info.get('dependencies', {})
         
         return dependencies
-
+    
+    def get_dependencies_batch(
+        self,
+        package_names: List[str],
+        version: str = "latest"
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Получает прямые зависимости нескольких пакетов параллельно.
+        
+        Запросы к registry выполняются в общем для всего fetcher пуле потоков,
+        поэтому сетевые задержки отдельных запросов перекрываются.
+        
+        Args:
+            package_names: Имена пакетов
+            version: Версия пакетов (по умолчанию 'latest')
+            
+        Returns:
+            Словарь {имя пакета: зависимости}; пакеты, для которых
+            не удалось получить данные, в словарь не попадают
+        """
+        def fetch(package_name: str) -> Optional[Dict[str, str]]:
+            try:
+                return self.get_dependencies(package_name, version)
+            except NPMFetcherError:
+                return None
+        
+        with self._pool_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            executor = self._executor
+        
+        # map сохраняет порядок, поэтому граф строится детерминированно
+        results = executor.map(fetch, package_names)
+        return {
+            package_name: dependencies
+            for package_name, dependencies in zip(package_names, results)
+            if dependencies is not None
+        }
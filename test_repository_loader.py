@@ -2,9 +2,25 @@
 Модуль для загрузки тестовых репозиториев из файла.
 В тестовом режиме пакеты называются большими латинскими буквами.
 """
+import io
 import json
 import os
-from typing import Dict, Callable
+import re
+from typing import Dict, Callable, Iterable, Mapping
+
+# Используем orjson для разбора JSON, если он установлен
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Строка текстового формата: "PACKAGE: DEP1, DEP2@VERSION, ..."
+_LINE_RE = re.compile(r'([^:]*):(.*)')
+# Элемент списка зависимостей до запятой: "DEP" или "DEP@VERSION"
+_DEP_RE = re.compile(r'\s*([^,@]*?)\s*(?:@\s*([^,]*?)\s*)?(?:,|$)')
+
+# Размер буфера чтения файла репозитория (1 МиБ вместо стандартных 8 КиБ)
+_READ_BUFFER_SIZE = 1 << 20
 
 
 class TestRepositoryError(Exception):
@@ -27,37 +43,50 @@ class TestRepositoryLoader:
         self._load_repository()
     
     def _load_repository(self) -> None:
-        """Загружает тестовый репозиторий из файла."""
+        """
+        Загружает тестовый репозиторий из файла.
+        
+        Формат определяется по первому непробельному байту: JSON разбирается
+        из байтов без предварительного декодирования, а текстовый формат
+        читается построчно.
+        """
         if not os.path.exists(self.file_path):
             raise TestRepositoryError(f"Файл тестового репозитория не найден: {self.file_path}")
         
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
+            with open(self.file_path, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+                # Определяем формат по первому непробельному байту
+                first_byte = f.read(1)
+                while first_byte and first_byte.isspace():
+                    first_byte = f.read(1)
+                f.seek(0)
                 
-                # Пытаемся загрузить как JSON
-                try:
-                    self.repository = json.loads(content)
-                except json.JSONDecodeError:
-                    # Если не JSON, пытаемся загрузить как текстовый формат
-                    self.repository = self._parse_text_format(content)
+                if first_byte in (b'{', b'['):
+                    # Пытаемся загрузить как JSON (байты разбираются без декодирования)
+                    try:
+                        self.repository = _json_loads(f.read())
+                        return
+                    except json.JSONDecodeError:
+                        f.seek(0)
+                
+                # Если не JSON, загружаем как текстовый формат
+                self.repository = self._parse_text_format(io.TextIOWrapper(f, encoding='utf-8'))
         
         except Exception as e:
             raise TestRepositoryError(f"Ошибка чтения файла: {e}")
     
-    def _parse_text_format(self, content: str) -> Dict[str, Dict[str, str]]:
+    def _parse_text_format(self, lines: Iterable[str]) -> Dict[str, Dict[str, str]]:
         """
         Парсит текстовый формат репозитория.
         Формат: PACKAGE: DEP1, DEP2, DEP3
         
         Args:
-            content: Содержимое файла
+            lines: Строки файла (например, открытый файл - он читается построчно)
             
         Returns:
             Словарь репозитория
         """
         repository = {}
-        lines = content.split('\n')
         
         for line in lines:
             line = line.strip()
@@ -65,52 +94,48 @@ class TestRepositoryLoader:
                 continue
             
             # Формат: PACKAGE: DEP1, DEP2, DEP3
-            if ':' in line:
-                parts = line.split(':', 1)
-                package = parts[0].strip()
-                deps_str = parts[1].strip() if len(parts) > 1 else ""
-                
-                # Парсим зависимости
-                dependencies = {}
-                if deps_str:
-                    for dep in deps_str.split(','):
-                        dep = dep.strip()
-                        if dep:
-                            # Формат может быть "DEP" или "DEP@VERSION"
-                            if '@' in dep:
-                                dep_name, dep_version = dep.split('@', 1)
-                                dependencies[dep_name.strip()] = dep_version.strip()
-                            else:
-                                dependencies[dep] = "1.0.0"  # Версия по умолчанию
-                
-                repository[package] = dependencies
+            match = _LINE_RE.match(line)
+            if match is None:
+                continue
+            
+            # Парсим зависимости одним проходом регулярного выражения.
+            # Формат может быть "DEP" или "DEP@VERSION" (без версии - "1.0.0").
+            # Словарь строится включением целиком, без поэлементных вставок в цикле
+            repository[match.group(1).strip()] = {
+                dep[1]: "1.0.0" if dep[2] is None else dep[2]
+                for dep in _DEP_RE.finditer(match.group(2))
+                if dep[1] or dep[2] is not None
+            }
         
         return repository
     
-    def get_dependencies(self, package_name: str, version: str = "latest") -> Dict[str, str]:
+    def get_dependencies(self, package_name: str, version: str = "latest") -> Mapping[str, str]:
         """
         Получает зависимости пакета из тестового репозитория.
         
+        Возвращается словарь из самого репозитория без копирования,
+        поэтому изменять его нельзя.
+        
         Args:
             package_name: Имя пакета (большие латинские буквы)
             version: Версия пакета (игнорируется в тестовом режиме)
             
         Returns:
-            Словарь зависимостей
+            Словарь зависимостей (только для чтения)
         """
         if package_name not in self.repository:
             return {}
         
-        return self.repository[package_name].copy()
+        return self.repository[package_name]
     
-    def create_dependency_getter(self) -> Callable[[str], Dict[str, str]]:
+    def create_dependency_getter(self) -> Callable[[str], Mapping[str, str]]:
         """
         Создает функцию для получения зависимостей, совместимую с DependencyGraph.
         
         Returns:
             Функция для получения зависимостей пакета
         """
-        def get_deps(package_name: str) -> Dict[str, str]:
+        def get_deps(package_name: str) -> Mapping[str, str]:
             return self.get_dependencies(package_name)
         
         return get_deps